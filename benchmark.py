@@ -0,0 +1,354 @@
+import os
+import re
+import subprocess
+import sys
+import time
+import json
+import base64
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RESET = "\033[0m"
+BOLD = "\033[1m"
+GREEN = "\033[92m"
+RED = "\033[91m"
+YELLOW = "\033[93m"
+STARTUP_RUNS = 10
+STARTUP_BUDGET_MS = 50
+# Modules that must only be imported when a feature actually needs them
+LAZY_MODULES = ["cryptography", "pyperclip", "asyncio", "concurrent.futures", "getpass", "hashlib", "shutil", "platform"]
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+SUITE_FILES = 2000
+SUITE_COMMITS = 50
+SUITE_BRANCHES = 200
+SUITE_RUNS = 5
+SUITE_CHANGED_FILES = 200
+TOKEN_STORE_SIZES = "10,1000,100000"
+BASELINE_FILE = os.path.join(SCRIPT_DIR, "benchmark_baselines.json")
+# A case fails when its median is over baseline * (1 + tolerance) + slack
+BASELINE_TOLERANCE = 0.5
+BASELINE_SLACK_MS = 5
+
+
+def get_arg_value(flag, default=None):
+    if flag in sys.argv:
+        idx = sys.argv.index(flag)
+        if idx + 1 < len(sys.argv):
+            return sys.argv[idx + 1]
+    return default
+
+
+def run_python(code):
+    env = dict(os.environ)
+    # Importing gitmanager must never need the key, make sure it isn't there
+    env.pop("GITMANAGER_KEY", None)
+    return subprocess.run([sys.executable] + code, cwd=SCRIPT_DIR, env=env, stdin=subprocess.DEVNULL,
+                          capture_output=True, encoding="utf-8")
+
+
+def median(values):
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+
+def measure_importtime(runs):
+    totals = []
+    children = {}
+    for _ in range(runs):
+        proc = run_python(["-X", "importtime", "-c", "import gitmanager"])
+        if proc.returncode != 0:
+            print(f"{RED}Importing gitmanager failed:{RESET}\n{proc.stderr}")
+            sys.exit(1)
+        lines = [m.groups() for m in map(IMPORTTIME_LINE.match, proc.stderr.splitlines()) if m]
+        for idx, (_, cumulative, indent, name) in enumerate(lines):
+            if name == "gitmanager" and not indent:
+                totals.append(int(cumulative) / 1000)
+                # importtime prints children before their parent, one level deeper
+                for _, child_cumulative, child_indent, child in reversed(lines[:idx]):
+                    if not child_indent:
+                        break
+                    if len(child_indent) == 2:
+                        children.setdefault(child, []).append(int(child_cumulative) / 1000)
+    return totals, {name: median(values) for name, values in children.items()}
+
+
+def measure_wall(code, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run_python(["-c", code])
+        samples.append((time.perf_counter() - start) * 1000)
+    return median(samples)
+
+
+def bench_startup():
+    runs = int(get_arg_value("--runs", STARTUP_RUNS))
+    budget = float(get_arg_value("--budget", STARTUP_BUDGET_MS))
+    # Warm-up run so the timings don't include writing the .pyc files
+    run_python(["-c", "import gitmanager"])
+    totals, children = measure_importtime(runs)
+    baseline = measure_wall("pass", runs)
+    with_import = measure_wall("import gitmanager", runs)
+    loaded = run_python(["-c", "import sys, gitmanager; print(' '.join(sys.modules))"]).stdout.split()
+    eager = [m for m in LAZY_MODULES if m in loaded]
+
+    import_ms = median(totals)
+    print(f"{BOLD}Startup benchmark ({runs} runs){RESET}")
+    print(f"import gitmanager (-X importtime): median {import_ms:.1f} ms, min {min(totals):.1f} ms, max {max(totals):.1f} ms")
+    print(f"interpreter alone: {baseline:.1f} ms, interpreter + import: {with_import:.1f} ms "
+          f"(+{with_import - baseline:.1f} ms)")
+    print("heaviest imports:")
+    for name, ms in sorted(children.items(), key=lambda item: -item[1])[:5]:
+        print(f"  {ms:7.1f} ms  {name}")
+    failed = False
+    if eager:
+        print(f"{RED}Modules that should be lazy were imported at startup: {', '.join(eager)}{RESET}")
+        failed = True
+    if import_ms > budget:
+        print(f"{RED}Import time {import_ms:.1f} ms is over the {budget:.0f} ms budget.{RESET}")
+        failed = True
+    if not failed:
+        print(f"{GREEN}Within the {budget:.0f} ms startup budget.{RESET}")
+    return 1 if failed else 0
+
+
+def git(args, cwd, input=None):
+    return subprocess.run(["git"] + args, cwd=cwd, input=input, capture_output=True, check=True).stdout
+
+
+def synthetic_history(files, commits, branches):
+    # One fast-import stream: every file in the first commit, then a few files changed
+    # per commit, and the branches spread over the history
+    out = []
+    stamp = 1700000000
+    per_commit = max(1, files // 50)
+    for c in range(commits):
+        out.append(f"commit refs/heads/main\nmark :{c + 1}\n"
+                   f"committer Bench <bench@example.com> {stamp + c} +0000\n"
+                   f"data {len(f'commit {c}')}\ncommit {c}\n")
+        changed = range(files) if c == 0 else range((c * per_commit) % files, min(files, (c * per_commit) % files + per_commit))
+        for k in changed:
+            content = f"file {k} revision {c}\n" * 20
+            out.append(f"M 100644 inline src/d{k // 100:03}/f{k:05}.txt\ndata {len(content)}\n{content}\n")
+        out.append("\n")
+    for b in range(branches):
+        out.append(f"reset refs/heads/feature-{b:04}\nfrom :{b % commits + 1}\n\n")
+    return "".join(out).encode("utf-8")
+
+
+def make_synthetic_repo(root, files, commits, branches):
+    remote = os.path.join(root, "remote.git")
+    git(["init", "-q", "--bare", remote], root)
+    git(["fast-import", "--quiet"], remote, input=synthetic_history(files, commits, branches))
+    git(["symbolic-ref", "HEAD", "refs/heads/main"], remote)
+    remote_url = "file://" + remote
+    for name in ("work", "other"):
+        git(["clone", "-q", remote_url, name], root)
+    return remote_url, os.path.join(root, "work"), os.path.join(root, "other")
+
+
+@contextmanager
+def quiet():
+    # git writes straight to the inherited descriptors, so redirect the fds themselves
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = [os.dup(1), os.dup(2)]
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    try:
+        os.dup2(devnull, 1)
+        os.dup2(devnull, 2)
+        yield
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
+        for fd in saved + [devnull]:
+            os.close(fd)
+
+
+@contextmanager
+def scripted_input(answers):
+    # Drives the interactive pickers the same way a user typing the answers would
+    import builtins
+    answers = iter(answers)
+    original = builtins.input
+    builtins.input = lambda prompt="": next(answers)
+    try:
+        yield
+    finally:
+        builtins.input = original
+
+
+def time_case(results, name, run, setup=None, runs=SUITE_RUNS):
+    samples = []
+    for _ in range(runs):
+        if setup:
+            with quiet():
+                setup()
+        start = time.perf_counter()
+        with quiet():
+            code = run()
+        samples.append((time.perf_counter() - start) * 1000)
+        if isinstance(code, int) and code != 0:
+            raise RuntimeError(f"{name} exited with code {code}")
+    results[name] = median(samples)
+    print(f"  {name:<28} {results[name]:10.1f} ms")
+
+
+def touch_files(work, count, label):
+    for k in range(count):
+        with open(os.path.join(work, f"src/d{k // 100:03}/f{k:05}.txt"), "a", encoding="utf-8") as f:
+            f.write(f"{label}\n")
+
+
+def bench_repo_cases(gm, results, runs, work, other, remote_url, changed):
+    token = "bench-token"
+    user, _ = gm.get_user_and_repo(remote_url)
+    counter = iter(range(1_000_000))
+
+    def modified():
+        touch_files(work, changed, next(counter))
+        git(["reset", "-q"], work)
+
+    os.chdir(work)
+    time_case(results, "show_git_status", gm.show_git_status, modified, runs)
+
+    def run_add():
+        with scripted_input(["a", "done"]):
+            return gm.interactive_git_add()
+    time_case(results, "interactive_git_add", run_add, modified, runs)
+    git(["reset", "-q", "--hard"], work)
+
+    def run_untrack():
+        with scripted_input(["d src/d000", "done"]):
+            return gm.untrack_files()
+
+    def run_restore():
+        with scripted_input(["a", "done"]):
+            return gm.restore_untracked_files()
+    untracked = {f"src/d000/f{k:05}.txt" for k in range(100)}
+    time_case(results, "untrack_files", run_untrack, lambda: git(["sparse-checkout", "disable"], work), runs)
+    time_case(results, "restore_untracked_files", run_restore,
+              lambda: gm.apply_sparse_exclusions(set(), untracked), runs)
+
+    def remote_commit():
+        git(["pull", "-q", "--ff-only"], other)
+        touch_files(other, 1, f"pull {next(counter)}")
+        git(["commit", "-q", "-am", "upstream change"], other)
+        git(["push", "-q"], other)
+    time_case(results, "make_pull", lambda: gm.make_pull(token, user, remote_url), remote_commit, runs)
+
+    def local_commit():
+        touch_files(work, 1, f"push {next(counter)}")
+        git(["commit", "-q", "-am", "local change"], work)
+    time_case(results, "make_push_no_add", lambda: gm.make_push_no_add(token, user, remote_url), local_commit, runs)
+    time_case(results, "make_push", lambda: gm.make_push(token, user, remote_url, "bench push"),
+              lambda: touch_files(work, changed, f"push {next(counter)}"), runs)
+
+
+def bench_token_store(gm, results, runs, root, size):
+    path = os.path.join(root, f"tokens-{size}.json")
+    store = gm.TokenStore(path)
+    urls = [f"https://example.com/user{n // 100}/repo{n}" for n in range(size)]
+    store.update((url, f"token-{url}") for url in urls)
+    time_case(results, f"token_store_save_{size}", store.compact, None, runs)
+    time_case(results, f"token_store_load_{size}", lambda: gm.TokenStore(path)[urls[-1]], None, runs)
+    counter = iter(range(1_000_000))
+
+    def set_token():
+        gm.TokenStore(path)[urls[0]] = f"token-{next(counter)}"
+    time_case(results, f"token_store_set_{size}", set_token, None, runs)
+
+
+def compare_baselines(results, config, baseline_path, tolerance):
+    try:
+        with open(baseline_path, encoding="utf-8") as f:
+            stored = json.load(f)
+    except FileNotFoundError:
+        # Without a baseline nothing is checked, which must not pass as "no regressions"
+        print(f"{RED}No baselines in {baseline_path}, run with --save-baseline to record them.{RESET}")
+        return 1
+    if stored.get("config") != config:
+        print(f"{RED}Baselines were recorded with {stored.get('config')}, not {config}. "
+              f"Run with the same options, or record new ones with --save-baseline.{RESET}")
+        return 1
+    failed = False
+    print(f"{BOLD}{'case':<28} {'median ms':>10} {'baseline':>10} {'change':>8}{RESET}")
+    for name, ms in results.items():
+        base = stored["cases"].get(name)
+        if base is None:
+            print(f"{name:<28} {ms:10.1f} {'-':>10}")
+            continue
+        regressed = ms > base * (1 + tolerance) + BASELINE_SLACK_MS
+        failed = failed or regressed
+        color = RED if regressed else GREEN
+        print(f"{name:<28} {ms:10.1f} {base:10.1f} {color}{(ms - base) / base * 100 if base else 0:+7.0f}%{RESET}")
+    if failed:
+        print(f"{RED}Some cases regressed more than {tolerance * 100:.0f}% over the baseline.{RESET}")
+    else:
+        print(f"{GREEN}No regressions against the baseline.{RESET}")
+    return 1 if failed else 0
+
+
+def bench_suite():
+    config = {"files": int(get_arg_value("--files", SUITE_FILES)),
+              "commits": int(get_arg_value("--commits", SUITE_COMMITS)),
+              "branches": int(get_arg_value("--branches", SUITE_BRANCHES)),
+              "changed": int(get_arg_value("--changed", SUITE_CHANGED_FILES))}
+    sizes = [int(n) for n in get_arg_value("--sizes", TOKEN_STORE_SIZES).split(",") if n]
+    runs = int(get_arg_value("--runs", SUITE_RUNS))
+    baseline_path = get_arg_value("--baseline", BASELINE_FILE)
+    tolerance = float(get_arg_value("--tolerance", BASELINE_TOLERANCE))
+
+    root = tempfile.mkdtemp(prefix="gitmanager-bench-")
+    # Reproducible and offline: no user configuration, no metrics, a throwaway key
+    os.environ.update(GIT_CONFIG_GLOBAL=os.devnull, GIT_CONFIG_NOSYSTEM="1", GIT_TERMINAL_PROMPT="0",
+                      GIT_AUTHOR_NAME="Bench", GIT_AUTHOR_EMAIL="bench@example.com",
+                      GIT_COMMITTER_NAME="Bench", GIT_COMMITTER_EMAIL="bench@example.com",
+                      GITMANAGER_METRICS="off", GITMANAGER_AGENT_SOCK=os.path.join(root, "agent.sock"),
+                      GITMANAGER_KEY=base64.urlsafe_b64encode(os.urandom(32)).decode())
+    sys.path.insert(0, SCRIPT_DIR)
+    import gitmanager as gm
+
+    results = {}
+    cwd = os.getcwd()
+    try:
+        print(f"{BOLD}Benchmark suite ({runs} runs, {config['files']} files, {config['commits']} commits, "
+              f"{config['branches']} branches){RESET}")
+        start = time.perf_counter()
+        remote_url, work, other = make_synthetic_repo(root, config["files"], config["commits"], config["branches"])
+        print(f"  synthetic repository built in {time.perf_counter() - start:.1f} s")
+        bench_repo_cases(gm, results, runs, work, other, remote_url, config["changed"])
+        for size in sizes:
+            bench_token_store(gm, results, runs, root, size)
+    finally:
+        os.chdir(cwd)
+        if "--keep" in sys.argv:
+            print(f"Synthetic repositories kept in {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+    if "--save-baseline" in sys.argv:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "cases": results}, f, indent=2)
+        print(f"{GREEN}Baselines saved to {baseline_path}.{RESET}")
+        return 0
+    return compare_baselines(results, config, baseline_path, tolerance)
+
+
+if __name__ == "__main__":
+    match sys.argv[1] if len(sys.argv) > 1 else "":
+        case "startup":
+            sys.exit(bench_startup())
+        case "suite":
+            sys.exit(bench_suite())
+        case _:
+            print("Usage: python3 benchmark.py startup [--runs N] [--budget MS]\n"
+                  "       python3 benchmark.py suite [--runs N] [--files N] [--commits N] [--branches N] [--changed N]\n"
+                  "                                  [--sizes 10,1000,100000] [--baseline PATH] [--save-baseline]\n"
+                  "                                  [--tolerance 0.5] [--keep]")
+            sys.exit(1)
@@ -1,6 +1,10 @@
 import os
+import sys
+import time
 import platform
 import base64
+import shutil
+import subprocess
 from cryptography.fernet import Fernet
 
 try:
@@ -8,12 +12,14 @@ try:
 except ImportError:
     pyperclip = None
 
+def run_clipboard_command(argv, text):
+    subprocess.run(argv, input=text, encoding="utf-8", check=True)
+
 def copy_to_clipboard_windows(text):
     try:
         if not isinstance(text, str):
             text = str(text)
-        cmd = f'echo {text.strip()}| clip'
-        os.system(cmd)
+        run_clipboard_command(["clip"], text.strip())
         print("Copied to clipboard!")
     except Exception:
         try:
@@ -27,11 +33,11 @@ def copy_to_clipboard_windows(text):
 
 def copy_to_clipboard_linux(text):
     try:
-        if os.system("which xclip > /dev/null 2>&1") == 0:
-            os.system(f"echo '{text}' | xclip -selection clipboard")
+        if shutil.which("xclip"):
+            run_clipboard_command(["xclip", "-selection", "clipboard"], text)
             print("Copied to clipboard!")
-        elif os.system("which xsel > /dev/null 2>&1") == 0:
-            os.system(f"echo '{text}' | xsel --clipboard --input")
+        elif shutil.which("xsel"):
+            run_clipboard_command(["xsel", "--clipboard", "--input"], text)
             print("Copied to clipboard!")
         else:
             if pyperclip:
@@ -44,7 +50,7 @@ def copy_to_clipboard_linux(text):
 
 def copy_to_clipboard_macos(text):
     try:
-        os.system(f"echo '{text}' | pbcopy")
+        run_clipboard_command(["pbcopy"], text)
         print("Copied to clipboard!")
     except Exception:
         try:
@@ -74,15 +80,14 @@ def copy_to_clipboard(text):
         except Exception:
             print("Clipboard copy not supported on this OS.")
 
-def generate_key():
-    key = Fernet.generate_key()
-    key_str = key.decode()
+def show_new_key(key_str):
     print("\nYour new encryption key (base64 32 bytes) is:\n")
     print(key_str)
     print("\nSave this key carefully! You will need it to decrypt your tokens.\n")
     copy_to_clipboard(key_str)
     print("The key has been copied to your clipboard.\n")
 
+def print_export_instructions(key_str):
     export_cmd = f'export GITMANAGER_KEY="{key_str}"'
     print(f"To set this key as an environment variable, you can run:\n\n{export_cmd}\n")
 
@@ -105,7 +110,59 @@ def generate_key():
         print(f'echo \'{export_cmd}\' >> {profile_file}')
         print("Then reload your shell or source the profile file.\n")
 
+def generate_key():
+    key_str = Fernet.generate_key().decode()
+    show_new_key(key_str)
+    print_export_instructions(key_str)
+
+def get_arg_value(flag, default=None):
+    if flag in sys.argv:
+        idx = sys.argv.index(flag)
+        if idx + 1 < len(sys.argv):
+            return sys.argv[idx + 1]
+    return default
+
+def rotate_key():
+    # The store format lives in gitmanager.py, next to this script
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import gitmanager
+    from cryptography.fernet import InvalidToken
+
+    store = os.path.expanduser(get_arg_value("--store", gitmanager.TOKEN_FILE))
+    if not os.path.exists(store):
+        print(f"No token store found at {store}.")
+        return 1
+    if gitmanager.agent_request({"op": "ping"}):
+        print("The token agent is running with the current key, stop it first: python3 gitmanager.py --agent-stop")
+        return 1
+    old_key = gitmanager.get_secret_key()
+    check = gitmanager.read_store_check(store)
+    if check is not None and check != gitmanager.token_index(old_key, gitmanager.KEY_CHECK_URL):
+        print("The current key does not match this token store, nothing was changed.")
+        return 1
+    new_key = Fernet.generate_key()
+    # Shown before the store is rewritten, so a crash right after the swap can't lose it
+    show_new_key(new_key.decode())
+
+    last = [0.0]
+    def progress(done, total):
+        now = time.monotonic()
+        if now - last[0] >= 0.2 or done == total:
+            last[0] = now
+            print(f"\rRe-encrypting tokens: {done}/{total} ({done * 100 // max(total, 1)}%)", end="", flush=True)
+
+    try:
+        count = gitmanager.rotate_store(store, old_key, new_key, progress)
+    except (ValueError, InvalidToken) as e:
+        print(f"\nKey rotation failed, the token store was not changed: {e or 'the current key cannot decrypt it'}")
+        return 1
+    print(f"\n{count} tokens re-encrypted with the new key. The old key no longer opens {store}.\n")
+    print_export_instructions(new_key.decode())
+    return 0
+
 
 
 if __name__ == "__main__":
+    if "--rotate" in sys.argv:
+        sys.exit(rotate_key())
     generate_key()
@@ -0,0 +1,85 @@
+import base64
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gitmanager  # noqa: E402
+
+KEY = base64.urlsafe_b64encode(b"k" * 32).decode()
+OTHER_KEY = base64.urlsafe_b64encode(b"o" * 32).decode()
+
+
+def use_key(monkeypatch, key):
+    # The key and the cipher are cached per process
+    monkeypatch.setenv("GITMANAGER_KEY", key)
+    monkeypatch.setattr(gitmanager, "_secret_key", None)
+    monkeypatch.setattr(gitmanager, "_cipher", None)
+
+
+def git(*args, cwd=None, check=True):
+    return subprocess.run(["git", *args], cwd=cwd, check=check, capture_output=True, text=True).stdout
+
+
+@pytest.fixture
+def gm(tmp_path, monkeypatch):
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    for name in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{name}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{name}_EMAIL", "test@example.com")
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    monkeypatch.setattr(gitmanager, "METRICS_FILE", "off")
+    monkeypatch.setattr(gitmanager, "AGENT_SOCKET", str(tmp_path / "agent.sock"))
+    monkeypatch.setattr(gitmanager, "_git_dirs", {})
+    use_key(monkeypatch, KEY)
+    return gitmanager
+
+
+@pytest.fixture
+def repo(gm, tmp_path, monkeypatch):
+    path = tmp_path / "repo"
+    git("init", "-q", "-b", "main", str(path))
+    monkeypatch.chdir(path)
+    return path
+
+
+@pytest.fixture
+def clone(gm, tmp_path, monkeypatch):
+    # A clone of a local bare repository with one pushed commit, returns the remote's URL
+    upstream = tmp_path / "upstream.git"
+    git("init", "-q", "--bare", "-b", "main", str(upstream))
+    path = tmp_path / "clone"
+    git("clone", "-q", str(upstream), str(path))
+    monkeypatch.chdir(path)
+    git("commit", "-q", "--allow-empty", "-m", "first")
+    git("push", "-q", "origin", "main")
+    return gm.normalize_remote_url(str(upstream))
+
+
+@pytest.fixture
+def agent(gm, tmp_path, monkeypatch):
+    # agent_serve on a thread instead of the forked daemon. Socket paths are limited to
+    # about 100 bytes, so the socket goes into a short directory of its own.
+    import socket
+    import tempfile
+    import threading
+    directory = tempfile.mkdtemp(prefix="gm-")
+    path = os.path.join(directory, "agent.sock")
+    monkeypatch.setattr(gm, "AGENT_SOCKET", path)
+    store = gm.TokenStore(str(tmp_path / "tokens"))
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(4)
+    thread = threading.Thread(target=gm.agent_serve, args=(server, store, 60), daemon=True)
+    thread.start()
+    yield store
+    gm.agent_request({"op": "stop"})
+    thread.join(5)
+    server.close()
+    os.remove(path)
+    os.rmdir(directory)
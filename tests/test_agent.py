@@ -0,0 +1,30 @@
+import pytest
+
+
+@pytest.mark.parametrize("request_, error", [
+    ("get", "invalid request"),
+    ({"op": "get", "url": 1}, "invalid request"),
+    ({"op": "nope"}, "unknown operation"),
+])
+def test_bad_requests(gm, tmp_path, request_, error):
+    assert gm.agent_handle(request_, gm.TokenStore(str(tmp_path / "tokens"))) == {"ok": False, "error": error}
+
+
+def test_serves_tokens_by_scope(gm, agent):
+    agent.update([("https://github.com/org", "org-token")])
+    assert gm.agent_request({"op": "ping"})["ok"]
+    assert gm.agent_lookup("https://github.com/org/repo") == "org-token"
+    assert gm.agent_lookup("https://github.com/other/repo") is None
+
+
+def test_sees_tokens_added_by_other_processes(gm, agent):
+    assert gm.agent_lookup("https://github.com/org/repo") is None
+    gm.TokenStore(agent.path)["https://github.com/org/repo"] = "token"
+    assert gm.agent_lookup("https://github.com/org/repo") == "token"
+
+
+def test_lookup_without_an_agent_uses_the_store(gm, tmp_path):
+    store = gm.TokenStore(str(tmp_path / "tokens"))
+    store["https://github.com/org"] = "org-token"
+    assert gm.agent_request({"op": "ping"}) is None
+    assert gm.lookup_token("https://github.com/org/repo", store) == "org-token"
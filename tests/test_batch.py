@@ -0,0 +1,41 @@
+import json
+import os
+
+from conftest import git
+
+
+def run(gm, capsys, operations, keep_going=False):
+    exit_code = gm.run_batch(operations, keep_going)
+    return exit_code, json.loads(capsys.readouterr().out)
+
+
+def test_parse_batch_operations(gm):
+    assert gm.parse_batch_operations(["add", "a", "::", "commit", "-m", "x"]) == [["add", "a"], ["commit", "-m", "x"]]
+
+
+def test_add_and_commit(gm, repo, capsys):
+    with open("a.txt", "w", encoding="utf-8") as f:
+        f.write("a")
+    exit_code, report = run(gm, capsys, [["add", "a.txt"], ["commit", "-m", "first"]])
+    assert exit_code == 0 and report["ok"]
+    assert report["results"][1]["data"]["commit"] == git("rev-parse", "HEAD").strip()
+
+
+def test_stops_at_the_first_failure(gm, repo, capsys):
+    exit_code, report = run(gm, capsys, [["nope"], ["status"]])
+    assert exit_code == 2 and not report["ok"]
+    assert [r["op"] for r in report["results"]] == ["nope"]
+    exit_code, report = run(gm, capsys, [["nope"], ["status"]], keep_going=True)
+    assert [r["ok"] for r in report["results"]] == [False, True]
+
+
+def test_sparse_exclude_only_keeps_the_other_files(gm, repo, capsys):
+    for name in ("a", "b", "c"):
+        with open(name, "w", encoding="utf-8") as f:
+            f.write(name)
+    git("add", ".")
+    git("commit", "-q", "-m", "files")
+    exit_code, report = run(gm, capsys, [["sparse", "exclude", "a", "b"], ["sparse", "exclude-only", "a"]])
+    assert exit_code == 0
+    assert report["results"][1]["data"] == {"untracked": ["a"]}
+    assert not os.path.exists("a") and os.path.exists("b") and os.path.exists("c")
@@ -0,0 +1,63 @@
+import io
+
+import pytest
+
+from conftest import git
+
+
+class UnopenedStore:
+    # Opening the token file would ask for the key, the agent has to answer instead
+    def __getattr__(self, name):
+        raise AssertionError("the token store was opened")
+
+    def __contains__(self, url):
+        raise AssertionError("the token store was opened")
+
+
+def run_helper(gm, monkeypatch, action, **fields):
+    fields = dict({"protocol": "https", "host": "github.com", "path": "org/repo.git"}, **fields)
+    monkeypatch.setattr("sys.stdin", io.StringIO("".join(f"{k}={v}\n" for k, v in fields.items()) + "\n"))
+    return gm.credential_helper(action)
+
+
+@pytest.fixture
+def tokens(gm, tmp_path, monkeypatch):
+    path = str(tmp_path / "tokens")
+    monkeypatch.setattr(gm, "load_tokens_encrypted", lambda: gm.TokenStore(path))
+    return path
+
+
+def test_get_answers_with_the_stored_token(gm, tokens, monkeypatch, capsys):
+    gm.TokenStore(tokens)["https://github.com/org"] = "org-token"
+    run_helper(gm, monkeypatch, "get")
+    assert capsys.readouterr().out == "username=org\npassword=org-token\n"
+
+
+def test_store_of_the_known_token_needs_no_key(gm, tokens, agent, monkeypatch, capsys):
+    agent.update([("https://github.com/org/repo", "token")])
+    monkeypatch.setattr(gm, "load_tokens_encrypted", UnopenedStore)
+    run_helper(gm, monkeypatch, "store", username="org", password="token")
+    run_helper(gm, monkeypatch, "erase", username="org", password="other")
+    assert capsys.readouterr().err == ""
+
+
+def test_store_saves_a_changed_token(gm, tokens, monkeypatch):
+    run_helper(gm, monkeypatch, "store", username="org", password="new")
+    assert gm.TokenStore(tokens)["https://github.com/org/repo"] == "new"
+
+
+def test_erase_only_drops_the_rejected_repository_token(gm, tokens, monkeypatch):
+    gm.TokenStore(tokens).update([("https://github.com/org/repo", "repo"), ("https://github.com/org", "org")])
+    run_helper(gm, monkeypatch, "erase", password="newer")
+    assert "https://github.com/org/repo" in gm.TokenStore(tokens)
+    run_helper(gm, monkeypatch, "erase", password="repo")
+    run_helper(gm, monkeypatch, "erase", path="org/other.git", password="org")
+    assert list(gm.TokenStore(tokens)) == ["https://github.com/org"]
+
+
+def test_install_is_idempotent_and_scoped(gm):
+    assert gm.install_credential_helper(["github.com"]) == 0
+    assert gm.install_credential_helper(["github.com"]) == 0
+    assert len(git("config", "--global", "--get-all", "credential.helper").splitlines()) == 1
+    assert git("config", "--global", "--get", "credential.https://github.com.useHttpPath").strip() == "true"
+    assert git("config", "--global", "--get", "credential.useHttpPath", check=False) == ""
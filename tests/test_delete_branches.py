@@ -0,0 +1,32 @@
+import os
+
+from conftest import git
+
+
+def test_deletes_branches_and_their_tracking_config(gm, repo, tmp_path):
+    git("commit", "-q", "--allow-empty", "-m", "base")
+    for name in ("one", "two", "kept", "busy"):
+        git("branch", name)
+    git("remote", "add", "origin", str(tmp_path / "remote.git"))
+    for name in ("one", "two", "kept"):
+        git("update-ref", f"refs/remotes/origin/{name}", "HEAD")
+        git("config", f"branch.{name}.remote", "origin")
+        git("config", f"branch.{name}.merge", f"refs/heads/{name}")
+    git("worktree", "add", "-q", str(tmp_path / "wt"), "busy")
+    branches = {b.name: b for b in gm.list_branches("main")}
+    assert gm.delete_branches([branches[name] for name in ("one", "two", "busy")]) == 0
+
+    assert git("for-each-ref", "--format=%(refname:short)", "refs/heads").split() == ["busy", "kept", "main"]
+    config = git("config", "--local", "--name-only", "--get-regexp", r"^branch\.").split()
+    assert config == ["branch.kept.remote", "branch.kept.merge"]
+    assert not os.path.exists(os.path.join(".git", "config.lock"))
+
+
+def test_moved_branch_is_not_deleted(gm, repo):
+    git("commit", "-q", "--allow-empty", "-m", "base")
+    git("branch", "moved")
+    stale = next(b for b in gm.list_branches("main") if b.name == "moved")
+    git("commit", "-q", "--allow-empty", "-m", "more")
+    git("branch", "-f", "moved")
+    assert gm.delete_branches([stale]) != 0
+    assert "moved" in git("branch", "--list", "moved")
@@ -0,0 +1,49 @@
+import pytest
+
+FILES = ["README.md", "docs/guide.md", "docs/index.md", "src/app.py", "src/util.py", "tests/test_app.py"]
+
+
+@pytest.fixture
+def picker(gm):
+    return gm.FilePicker(iter(FILES), "files", sorted_source=True, page_size=2)
+
+
+def test_source_is_read_lazily(gm):
+    source = iter(FILES)
+    picker = gm.FilePicker(source, "files", page_size=2)
+    picker.render()
+    # One page and one more item, to know whether there is a next page
+    assert picker.items == FILES[:3]
+    assert next(source) == FILES[3]
+
+
+def test_fuzzy_and_prefix_queries(picker):
+    picker.set_query("app")
+    picker._fill()
+    assert [picker.items[i] for i in picker.matches] == ["src/app.py", "tests/test_app.py"]
+    picker.set_query("appy")
+    assert [picker.items[i] for i in picker.matches] == ["src/app.py", "tests/test_app.py"]
+    picker.set_query("^docs/")
+    assert [picker.items[i] for i in picker.matches] == ["docs/guide.md", "docs/index.md"]
+    picker.set_query("^docs/g")
+    assert [picker.items[i] for i in picker.matches] == ["docs/guide.md"]
+
+
+def test_parse_numbers_counts_within_the_matches(picker):
+    picker.set_query("^src/")
+    assert picker.parse_numbers("1-2") == [FILES.index("src/app.py"), FILES.index("src/util.py")]
+    assert picker.parse_numbers("3") is None
+    assert picker.parse_numbers("1,x") is None
+
+
+def test_toggle_selects_then_clears_a_group(picker):
+    picker.toggle([0, 1])
+    assert picker.selected == {0, 1}
+    picker.toggle([1, 2])
+    assert picker.selected == {0, 1, 2}
+    picker.toggle([1, 2])
+    assert picker.selected == {0}
+
+
+def test_directory_lookup(picker):
+    assert [picker.items[i] for i in picker._prefix_range("src/")] == ["src/app.py", "src/util.py"]
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+from conftest import KEY, OTHER_KEY, use_key
+
+
+@pytest.fixture
+def store_path(gm, tmp_path):
+    return str(tmp_path / "tokens")
+
+
+def test_rotate_store(gm, store_path, monkeypatch):
+    store = gm.TokenStore(store_path)
+    store.update([("https://github.com/org/a", "token-a")])
+    # Left in the journal, rotation has to fold it in
+    store["https://github.com/org/b"] = "token-b"
+    assert gm.rotate_store(store_path, KEY.encode(), OTHER_KEY.encode()) == 2
+    assert not os.path.exists(store_path + gm.JOURNAL_SUFFIX)
+
+    with pytest.raises(gm.TokenStoreError):
+        len(gm.TokenStore(store_path))
+    use_key(monkeypatch, OTHER_KEY)
+    rotated = gm.TokenStore(store_path)
+    assert {url: rotated[url] for url in rotated} == {"https://github.com/org/a": "token-a",
+                                                      "https://github.com/org/b": "token-b"}
+
+
+def test_rotate_refuses_a_wrong_old_key(gm, store_path):
+    gm.TokenStore(store_path)["https://github.com/org/a"] = "token-a"
+    before = open(store_path, "rb").read()
+    with pytest.raises(gm.TokenStoreError):
+        gm.rotate_store(store_path, OTHER_KEY.encode(), KEY.encode())
+    assert open(store_path, "rb").read() == before
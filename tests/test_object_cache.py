@@ -0,0 +1,72 @@
+import shutil
+
+import pytest
+
+from conftest import git
+
+
+@pytest.fixture
+def upstream(gm, tmp_path, monkeypatch):
+    monkeypatch.setattr(gm, "OBJECT_CACHE_DIR", str(tmp_path / "objects"))
+    path = tmp_path / "upstream.git"
+    git("init", "-q", "--bare", "-b", "main", str(path))
+    seed = tmp_path / "seed"
+    git("clone", "-q", str(path), str(seed))
+    git("commit", "-q", "--allow-empty", "-m", "first", cwd=seed)
+    git("push", "-q", "origin", "HEAD:main", cwd=seed)
+    return path
+
+
+def commit_upstream(tmp_path, message):
+    seed = tmp_path / "seed"
+    git("commit", "-q", "--allow-empty", "-m", message, cwd=seed)
+    git("push", "-q", "origin", "HEAD:main", cwd=seed)
+    return git("rev-parse", "HEAD", cwd=seed).strip()
+
+
+@pytest.mark.parametrize("track", [True, False])
+def test_pull_through_a_cache_without_origin_head(gm, upstream, tmp_path, monkeypatch, track):
+    # git init + remote add: no refs/remotes/origin/HEAD, and git init's default branch
+    # in the cache would be "master"
+    clone = tmp_path / "clone"
+    git("init", "-q", "-b", "main", str(clone))
+    monkeypatch.chdir(clone)
+    git("remote", "add", "origin", str(upstream))
+    git("fetch", "-q", "origin")
+    git("reset", "-q", "--hard", "origin/main")
+    if track:
+        git("branch", "-q", "--set-upstream-to", "origin/main")
+    repo_url = gm.normalize_remote_url(str(upstream))
+    assert gm.link_object_cache(str(clone), repo_url, None) == 0
+    cache = gm.get_linked_cache()
+    assert git("--git-dir", cache, "symbolic-ref", "HEAD").strip() == "refs/heads/main"
+    assert git("--git-dir", cache, "config", "gc.auto").strip() == "0"
+    assert git("--git-dir", cache, "config", "gc.pruneExpire").strip() == "never"
+
+    head = commit_upstream(tmp_path, "second")
+    assert gm.make_pull(None, "user", repo_url) == 0
+    assert git("rev-parse", "HEAD").strip() == head
+
+
+def test_maintenance_keeps_what_clones_borrow(gm, upstream, tmp_path, monkeypatch):
+    clone = tmp_path / "clone"
+    git("clone", "-q", str(upstream), str(clone))
+    monkeypatch.chdir(clone)
+    repo_url = gm.normalize_remote_url(str(upstream))
+    assert gm.link_object_cache(str(clone), repo_url, None) == 0
+    # Tiny clones keep their objects loose; drop them so the clone really borrows
+    for entry in (clone / ".git" / "objects").iterdir():
+        if len(entry.name) == 2:
+            shutil.rmtree(entry)
+    git("fsck", "--connectivity-only")
+    # Packed first: repack -a -d only drops unreachable objects that are in a pack
+    assert gm.maintain_object_caches("repack") == 0
+    # The upstream history is rewritten: the clone's commits are unreachable in the cache
+    seed = tmp_path / "seed"
+    git("checkout", "-q", "--orphan", "rewritten", cwd=seed)
+    git("commit", "-q", "--allow-empty", "-m", "rewritten", cwd=seed)
+    git("push", "-q", "--force", "origin", "HEAD:main", cwd=seed)
+    assert gm.fetch_object_cache(gm.get_linked_cache(), repo_url, None, None, echo=False).returncode == 0
+    assert gm.maintain_object_caches("repack") == 0
+    assert gm.maintain_object_caches("prune") == 0
+    git("fsck", "--connectivity-only")
@@ -0,0 +1,23 @@
+import shutil
+
+from conftest import git
+
+
+def test_unreachable_push_is_queued_and_flushed(gm, clone, tmp_path):
+    upstream, moved = tmp_path / "upstream.git", tmp_path / "away.git"
+    git("commit", "-q", "--allow-empty", "-m", "second")
+    head = git("rev-parse", "HEAD").strip()
+    shutil.move(upstream, moved)
+    assert gm.push_current("token", "user", clone) == gm.EXIT_QUEUED
+    assert gm.queued_pushes(clone)["main"]["oid"] == head
+
+    shutil.move(moved, upstream)
+    assert gm.flush_push_queue("token", "user", clone) == 0
+    assert gm.queued_pushes(clone) == {}
+    assert git("rev-parse", "main", cwd=upstream).strip() == head
+
+
+def test_flush_drops_commits_that_no_longer_exist(gm, clone):
+    gm.save_push_queue({f"{clone} gone": {"oid": "1" * 40, "time": 0}})
+    assert gm.flush_push_queue("token", "user", clone) == 0
+    assert gm.queued_pushes(clone) == {}
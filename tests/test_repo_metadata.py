@@ -0,0 +1,26 @@
+from conftest import git
+
+
+def no_git(*args, **kwargs):
+    raise AssertionError(f"git was run: {args}")
+
+
+def test_metadata_is_cached_until_the_config_or_head_change(gm, clone, tmp_path, monkeypatch):
+    metadata = gm.get_repo_metadata()
+    assert (metadata["repo_url"], metadata["branch"], metadata["upstream"]) == (clone, "main", "origin/main")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(gm, "run_git", no_git)
+        assert gm.get_repo_metadata() == metadata
+
+    moved = str(tmp_path / "elsewhere" / "upstream.git")
+    git("remote", "set-url", "origin", moved)
+    assert gm.get_repo_metadata()["repo_url"] == gm.normalize_remote_url(moved)
+    git("checkout", "-q", "-b", "topic")
+    assert gm.get_repo_metadata()["branch"] == "topic"
+
+
+def test_no_repository(gm, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path))
+    assert gm.get_repo_metadata() is None
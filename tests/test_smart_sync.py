@@ -0,0 +1,41 @@
+from conftest import git
+
+
+def get_token():
+    return "token"
+
+
+def unreachable(*args, **kwargs):
+    raise AssertionError(f"the remote was asked: {args}")
+
+
+def test_pushes_local_commits_then_trusts_the_cached_remote(gm, clone, tmp_path, monkeypatch):
+    git("commit", "-q", "--allow-empty", "-m", "second")
+    head = git("rev-parse", "HEAD").strip()
+    assert gm.smart_sync(clone, get_token) == 0
+    assert git("rev-parse", "main", cwd=tmp_path / "upstream.git").strip() == head
+
+    # Within the TTL the remote isn't asked again
+    monkeypatch.setattr(gm, "run_remote_git", unreachable)
+    assert gm.smart_sync(clone, get_token) == 0
+
+
+def test_fast_forwards_to_the_remote(gm, clone, tmp_path):
+    other = tmp_path / "other"
+    git("clone", "-q", str(tmp_path / "upstream.git"), str(other))
+    git("commit", "-q", "--allow-empty", "-m", "elsewhere", cwd=other)
+    git("push", "-q", "origin", "main", cwd=other)
+    remote = git("rev-parse", "HEAD", cwd=other).strip()
+    assert gm.smart_sync(clone, get_token) == 0
+    assert git("rev-parse", "HEAD").strip() == remote
+
+
+def test_diverged_branches_are_left_alone(gm, clone, tmp_path):
+    other = tmp_path / "other"
+    git("clone", "-q", str(tmp_path / "upstream.git"), str(other))
+    git("commit", "-q", "--allow-empty", "-m", "elsewhere", cwd=other)
+    git("push", "-q", "origin", "main", cwd=other)
+    git("commit", "-q", "--allow-empty", "-m", "here")
+    head = git("rev-parse", "HEAD").strip()
+    assert gm.smart_sync(clone, get_token) == 1
+    assert git("rev-parse", "HEAD").strip() == head
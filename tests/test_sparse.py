@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from conftest import git
+
+
+@pytest.mark.parametrize("path", ["plain.txt", "a*b/[x]?.txt", "back\\slash", "trailing  ", "dir/#hash", "!bang"])
+def test_sparse_escaping_round_trip(gm, path):
+    pattern = gm.escape_sparse_path(path)
+    assert pattern.startswith("/")
+    assert gm.unescape_sparse_pattern(pattern) == path
+
+
+def test_trailing_spaces_are_escaped(gm):
+    assert gm.escape_sparse_path("name  ") == "/name\\ \\ "
+
+
+@pytest.fixture
+def tree_repo(repo):
+    for path in ("top", "a/af", "a/b/bf", "a/b/c/cf", "a/b/c/deep/df", "x/xf"):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(path)
+    git("add", ".")
+    git("commit", "-q", "-m", "tree")
+    return repo
+
+
+def test_exclusions_round_trip(gm, tree_repo):
+    gm.apply_sparse_exclusions(set(), {"x/xf", "a/b/bf"})
+    assert gm.get_sparse_exclusions() == {"x/xf", "a/b/bf"}
+    assert not os.path.exists("x/xf")
+    gm.apply_sparse_exclusions({"x/xf", "a/b/bf"}, {"a/b/bf"})
+    assert gm.get_sparse_exclusions() == {"a/b/bf"}
+    assert os.path.exists("x/xf")
+
+
+def test_cone_exclusions_keep_the_files_of_parent_directories(gm, tree_repo):
+    git("sparse-checkout", "set", "--cone", "a/b/c")
+    assert gm.get_sparse_exclusions() == {"x/xf"}
+
+
+def test_normalize_cone(gm):
+    assert gm.normalize_cone(["a/b/", "/a", "c/d", "c/de", ""]) == ["a", "c/d", "c/de"]
+
+
+def test_cone_coverage_counts_parent_files(gm, tree_repo):
+    tree = gm.build_dir_tree()
+    assert tree.stats[""][0] == 6
+    files, size = gm.cone_coverage(tree, ["a/b/c"])
+    # a/b/c/cf and a/b/c/deep/df, plus top, a/af and a/b/bf
+    assert files == 5
+    assert size == sum(len(p) for p in ("top", "a/af", "a/b/bf", "a/b/c/cf", "a/b/c/deep/df"))
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from conftest import git
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def staged():
+    return sorted(git("diff", "--cached", "--name-only", "-z").split("\0")[:-1])
+
+
+@pytest.mark.parametrize("action, expected", [
+    ("skip", ["small.txt", "sub/changed.txt"]),
+    ("add", ["big.bin", "small.txt", "sub/changed.txt"]),
+])
+def test_stage_changes_holds_back_large_files(gm, repo, action, expected):
+    write("sub/changed.txt", "old")
+    git("add", ".")
+    git("commit", "-q", "-m", "initial")
+    write("sub/changed.txt", "new")
+    write("small.txt", "x" * 10)
+    write("big.bin", "x" * 11)
+    write(".gitignore", "*.log\n")
+    write("ignored.log", "x" * 100)
+    git("add", ".gitignore")
+    assert gm.stage_changes(threshold=10, action=action) == 0
+    assert staged() == sorted(expected + [".gitignore"])
+
+
+def test_find_changed_files_uses_the_threshold(gm, repo):
+    write("exact.bin", "x" * 10)
+    write("over.bin", "x" * 11)
+    small, large = gm.find_changed_files(10)
+    assert small == ["exact.bin"]
+    assert large == [("over.bin", 11)]
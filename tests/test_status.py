@@ -0,0 +1,44 @@
+import os
+
+from conftest import git
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def test_parse_status_v2(gm, repo):
+    write("renamed.txt", "content\n")
+    write("modified.txt", "a\n")
+    git("add", ".")
+    git("commit", "-q", "-m", "initial")
+    git("mv", "renamed.txt", "new name.txt")
+    write("modified.txt", "b\n")
+    write("untracked.txt", "")
+    snapshot = gm.parse_status_v2(git("status", "--porcelain=v2", "-z", "--branch"))
+    assert snapshot.branch == "main"
+    assert snapshot.oid == git("rev-parse", "HEAD").strip()
+    entries = {e.path: e for e in snapshot.entries}
+    assert entries["new name.txt"].kind == "2"
+    assert entries["new name.txt"].orig_path == "renamed.txt"
+    assert entries["modified.txt"].xy == ".M"
+    assert entries["untracked.txt"].kind == "?"
+
+
+def test_parse_status_v2_ahead_behind(gm):
+    output = "\0".join(["# branch.oid " + "a" * 40, "# branch.head topic", "# branch.upstream origin/topic",
+                        "# branch.ab +2 -3", ""])
+    snapshot = gm.parse_status_v2(output)
+    assert (snapshot.branch, snapshot.upstream, snapshot.ahead, snapshot.behind) == ("topic", "origin/topic", 2, 3)
+    assert snapshot.entries == []
+
+
+def test_interactive_add_from_a_subdirectory(gm, repo, monkeypatch):
+    write("sub/a.txt", "a\n")
+    write("top.txt", "top\n")
+    monkeypatch.chdir("sub")
+    monkeypatch.setattr(gm, "pick_files", lambda files, *args, **kwargs: list(files))
+    gm.interactive_git_add()
+    assert sorted(git("diff", "--cached", "--name-only").split()) == ["sub/a.txt", "top.txt"]
@@ -0,0 +1,28 @@
+import pytest
+
+
+@pytest.fixture
+def store_path(gm, tmp_path):
+    return str(tmp_path / "tokens")
+
+
+@pytest.mark.parametrize("url, scopes", [
+    ("https://github.com/org/repo", ["https://github.com/org/repo", "https://github.com/org", "https://github.com"]),
+    ("git@github.com:org/repo.git", ["git@github.com:org/repo.git", "https://github.com/org/repo",
+                                     "https://github.com/org", "https://github.com"]),
+    ("ssh://git@host:2222/group/sub/repo", ["ssh://git@host:2222/group/sub/repo", "https://host/group/sub/repo",
+                                            "https://host/group/sub", "https://host/group", "https://host"]),
+    ("/srv/git/repo.git", ["/srv/git/repo.git"]),
+])
+def test_token_scopes(gm, url, scopes):
+    assert gm.token_scopes(url) == scopes
+
+
+def test_resolve_prefers_the_most_specific_scope(gm, store_path):
+    store = gm.TokenStore(store_path)
+    store.update([("https://github.com", "host"), ("https://github.com/org", "org"),
+                  ("https://github.com/org/repo", "repo")])
+    assert store.resolve("https://github.com/org/repo") == ("https://github.com/org/repo", "repo")
+    assert store.resolve("git@github.com:org/other.git") == ("https://github.com/org", "org")
+    assert store.resolve("https://github.com/elsewhere/repo") == ("https://github.com", "host")
+    assert store.resolve("https://gitlab.com/org/repo") is None
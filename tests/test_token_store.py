@@ -0,0 +1,112 @@
+import json
+import os
+
+import pytest
+from cryptography.fernet import Fernet
+
+from conftest import KEY, OTHER_KEY, use_key
+
+
+@pytest.fixture
+def store_path(gm, tmp_path):
+    return str(tmp_path / "tokens")
+
+
+def test_round_trip_through_journal(gm, store_path):
+    store = gm.TokenStore(store_path)
+    store["https://github.com/org/a"] = "token-a"
+    store["https://github.com/org/b"] = "token-b"
+    del store["https://github.com/org/a"]
+    assert os.path.exists(store_path + gm.JOURNAL_SUFFIX)
+
+    reloaded = gm.TokenStore(store_path)
+    assert sorted(reloaded) == ["https://github.com/org/b"]
+    assert reloaded["https://github.com/org/b"] == "token-b"
+    assert "https://github.com/org/a" not in reloaded
+
+
+def test_torn_journal_line_is_ignored(gm, store_path):
+    store = gm.TokenStore(store_path)
+    store["https://github.com/org/a"] = "token-a"
+    with open(store_path + gm.JOURNAL_SUFFIX, "a", encoding="utf-8") as f:
+        f.write("set\tdeadbeef\tpartial")
+    reloaded = gm.TokenStore(store_path)
+    assert list(reloaded) == ["https://github.com/org/a"]
+    assert reloaded.journal_ops == 1
+
+
+def test_journal_is_compacted(gm, store_path, monkeypatch):
+    monkeypatch.setattr(gm, "JOURNAL_COMPACT_OPS", 3)
+    store = gm.TokenStore(store_path)
+    for n in range(3):
+        store[f"https://github.com/org/r{n}"] = f"token-{n}"
+    assert not os.path.exists(store_path + gm.JOURNAL_SUFFIX)
+    assert store.journal_ops == 0
+    assert len(gm.TokenStore(store_path)) == 3
+
+
+def test_compaction_keeps_appends_of_other_stores(gm, store_path):
+    first, second = gm.TokenStore(store_path), gm.TokenStore(store_path)
+    first["https://github.com/org/a"] = "token-a"
+    second["https://github.com/org/b"] = "token-b"
+    first.compact()
+    reloaded = gm.TokenStore(store_path)
+    assert sorted(reloaded) == ["https://github.com/org/a", "https://github.com/org/b"]
+
+
+def test_update_writes_one_snapshot(gm, store_path):
+    store = gm.TokenStore(store_path)
+    store["https://github.com/org/a"] = "token-a"
+    store.update([("https://github.com/org/a", None), ("https://github.com/org/b", "token-b")])
+    assert not os.path.exists(store_path + gm.JOURNAL_SUFFIX)
+    assert sorted(gm.TokenStore(store_path)) == ["https://github.com/org/b"]
+
+
+def test_legacy_store_is_migrated(gm, store_path):
+    tokens = {"https://github.com/org/a": "token-a", "https://github.com/org/b": "token-b"}
+    with open(store_path, "wb") as f:
+        f.write(Fernet(KEY).encrypt(json.dumps(tokens).encode("utf-8")))
+    store = gm.TokenStore(store_path)
+    assert {url: store[url] for url in store} == tokens
+    assert gm.read_store_check(store_path) is not None
+
+
+def test_wrong_key_is_refused(gm, store_path, monkeypatch):
+    gm.TokenStore(store_path)["https://github.com/org/a"] = "token-a"
+    use_key(monkeypatch, OTHER_KEY)
+    with pytest.raises(gm.TokenStoreError):
+        len(gm.TokenStore(store_path))
+
+
+def test_lookup_bisects_the_sorted_snapshot(gm, store_path):
+    store = gm.TokenStore(store_path)
+    store.update([(f"https://github.com/org/r{n}", f"token-{n}") for n in range(200)])
+    reloaded = gm.TokenStore(store_path)
+    assert len(reloaded) == 200
+    assert all(reloaded[f"https://github.com/org/r{n}"] == f"token-{n}" for n in range(0, 200, 7))
+    assert "https://github.com/org/missing" not in reloaded
+    indexes = [index for index, _ in gm.read_store_entries(store_path)]
+    assert indexes == sorted(indexes)
+
+
+def test_append_does_not_load_the_snapshot(gm, store_path):
+    gm.TokenStore(store_path).update([("https://github.com/org/a", "token-a")])
+    store = gm.TokenStore(store_path)
+    store["https://github.com/org/b"] = "token-b"
+    assert store._changes is None
+    reloaded = gm.TokenStore(store_path)
+    assert sorted(reloaded) == ["https://github.com/org/a", "https://github.com/org/b"]
+    assert len(reloaded) == 2
+
+
+def test_unsorted_store_is_upgraded(gm, store_path):
+    check = gm.token_index(KEY, gm.KEY_CHECK_URL)
+    lines = [f"{gm.UNSORTED_STORE_HEADER}\t{check}"]
+    for url in ("https://github.com/org/z", "https://github.com/org/a"):
+        entry = Fernet(KEY).encrypt(json.dumps({"url": url, "token": url[-1]}).encode("utf-8")).decode("ascii")
+        lines.append(f"{gm.token_index(KEY, url)}\t{entry}")
+    with open(store_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    store = gm.TokenStore(store_path)
+    assert store["https://github.com/org/z"] == "z"
+    assert gm.read_store_header(store_path)[::2] == (gm.STORE_HEADER, 2)